@@ -2,10 +2,13 @@ import argparse
 import asyncio
 from src.config import load_config
 from src.data_collector import BinanceOrderBookCollector
+from src.exchange.orderbook_bus import OrderBookPublisher
 from src.features import build_dataset
-from src.model import train_model
+from src.model import train_model, prune_features
+from src.tuning import tune_model
 from src.backtest import run_backtest
 from src.live_trading import run_live_trading
+from src.portfolio_trading import run_portfolio_trading
 from src.utils.logging import setup_logging
 
 
@@ -16,18 +19,31 @@ def main() -> None:
     collect = sub.add_parser("collect-data", help="Collect Binance orderbook data")
     collect.add_argument("--config", required=True, help="Config path for dataset collection")
 
+    publish = sub.add_parser("publish-book", help="Publish Binance orderbook to shared memory bus")
+    publish.add_argument("--config", required=True, help="Config path for orderbook bus")
+
     build = sub.add_parser("build-dataset", help="Build features and labels")
     build.add_argument("--config", required=True, help="Dataset config path")
 
     train = sub.add_parser("train-model", help="Train ML model")
     train.add_argument("--config", required=True, help="Training config path")
 
+    tune = sub.add_parser("tune-model", help="Search model params with successive halving")
+    tune.add_argument("--config", required=True, help="Tuning config path")
+
+    prune = sub.add_parser("prune-features", help="Drop low-importance features from a training config")
+    prune.add_argument("--config", required=True, help="Training config path")
+    prune.add_argument("--output", required=True, help="Output path for pruned config")
+
     backtest = sub.add_parser("backtest", help="Run backtest and grid search")
     backtest.add_argument("--config", required=True, help="Backtest config path")
 
     live = sub.add_parser("live-trade", help="Run live trading loop")
     live.add_argument("--config", required=True, help="Live trading config path")
 
+    portfolio = sub.add_parser("live-portfolio", help="Run multi-symbol live trading in one event loop")
+    portfolio.add_argument("--config", required=True, help="Live trading config path")
+
     args = parser.parse_args()
 
     if args.command == "collect-data":
@@ -35,6 +51,11 @@ def main() -> None:
         logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
         collector = BinanceOrderBookCollector(cfg, logger)
         asyncio.run(collector.run())
+    elif args.command == "publish-book":
+        cfg = load_config(args.config)
+        logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
+        publisher = OrderBookPublisher(cfg, logger)
+        asyncio.run(publisher.run())
     elif args.command == "build-dataset":
         cfg = load_config(args.config)
         logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
@@ -43,6 +64,14 @@ def main() -> None:
         cfg = load_config(args.config)
         logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
         train_model(cfg, logger)
+    elif args.command == "tune-model":
+        cfg = load_config(args.config)
+        logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
+        tune_model(cfg, logger, args.config)
+    elif args.command == "prune-features":
+        cfg = load_config(args.config)
+        logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
+        prune_features(cfg, logger, args.config, args.output)
     elif args.command == "backtest":
         cfg = load_config(args.config)
         logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
@@ -51,6 +80,10 @@ def main() -> None:
         cfg = load_config(args.config)
         logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
         asyncio.run(run_live_trading(cfg, logger))
+    elif args.command == "live-portfolio":
+        cfg = load_config(args.config)
+        logger = setup_logging(cfg.paths.log_dir, cfg.app.log_level)
+        asyncio.run(run_portfolio_trading(cfg, logger))
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.model import load_model
+from src.prediction_cache import cached_predictions
 from src.config import Config
 from src.utils.metrics import total_return, sharpe_ratio, max_drawdown, annualized_return
 
@@ -52,8 +52,7 @@ def _load_dataset(cfg: Config):
 
 def run_backtest(cfg: Config, logger) -> None:
     X, y, _ = _load_dataset(cfg)
-    model = load_model(cfg.backtest.model_path)
-    proba = model.predict_proba(X)[:, -1] if hasattr(model, "predict_proba") else model.predict(X)
+    proba = cached_predictions(cfg, X, logger)
     price = np.cumprod(1 + np.random.normal(0, 0.0005, size=len(proba)))
     eq, trades = _run_strategy(proba, price, cfg)
 
@@ -2,7 +2,7 @@ import os
 from pathlib import Path
 from typing import List, Optional
 import yaml
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class PathConfig(BaseModel):
@@ -26,6 +26,18 @@ class BinanceConfig(BaseModel):
     stream_interval: str = "100ms"
 
 
+class BusConfig(BaseModel):
+    enabled: bool = False
+    # 仅用于单 symbol；多 symbol 时每个 symbol 固定使用 lq_ob_<symbol>
+    name: Optional[str] = None
+    levels: int = Field(default=20, ge=1)
+    # 读者拿到的是环形槽位的视图，发布者再写入 capacity - 1 帧后该视图即失效；
+    # 需覆盖消费者持有一帧的最长时间（含 live.batch_window_ms 和组合模式的队列等待）
+    capacity: int = Field(default=1024, ge=2)
+    poll_interval_ms: int = 5
+    stale_after_s: float = 5.0
+
+
 class LighterConfig(BaseModel):
     base_url: str = "https://mainnet.zklighter.elliot.ai"
     api_key: Optional[str] = None
@@ -45,6 +57,13 @@ class DatasetConfig(BaseModel):
     top_levels: int = 10
     agg_depths: List[int] = Field(default_factory=lambda: [5, 10])
     lag_steps: List[int] = Field(default_factory=lambda: [1, 5, 10, 50])
+    return_horizons: List[int] = Field(default_factory=lambda: [1, 5, 10, 50])
+    # None 时由 return_horizons 推导：lag 用全部 ret_h + spread/rel_spread，rolling 用最短的 ret_h + spread
+    lag_cols: Optional[List[str]] = None
+    roll_cols: Optional[List[str]] = None
+    roll_windows: List[int] = Field(default_factory=lambda: [5, 10, 20])
+    # None 表示使用注册表中的全部特征
+    features: Optional[List[str]] = None
     future_horizon: int = 10
     up_threshold: float = 0.0005
     down_threshold: float = -0.0005
@@ -53,9 +72,28 @@ class DatasetConfig(BaseModel):
 
 class TrainConfig(BaseModel):
     model_type: str = "random_forest"
-    model_params: dict = Field(default_factory=lambda: {"n_estimators": 200, "max_depth": 8, "n_jobs": -1})
+    # 未配置时按 model_type 取默认参数
+    model_params: Optional[dict] = None
     train_ratio: float = 0.8
     model_output: str = "models/orderbook_model.joblib"
+    prune_threshold: float = 0.005
+
+    @model_validator(mode="after")
+    def fill_model_params(self):
+        if self.model_params is None:
+            defaults = {"random_forest": {"n_estimators": 200, "max_depth": 8, "n_jobs": -1}}
+            self.model_params = dict(defaults.get(self.model_type, {}))
+        return self
+
+class TuneConfig(BaseModel):
+    # 参数名 -> 候选值列表
+    param_space: dict = Field(default_factory=dict)
+    n_candidates: int = 27
+    eta: int = 3
+    min_fraction: float = 0.1
+    metric: str = "f1"
+    n_workers: Optional[int] = None
+    output: str = "configs/train_tuned.yml"
 
 class BacktestConfig(BaseModel):
     dataset_path: str = "data/processed/dataset.pkl"
@@ -69,10 +107,16 @@ class BacktestConfig(BaseModel):
     fee_rate: float = 0.0
     grid: Optional[dict] = None
     plot_dir: str = "data/plots"
+    pred_cache: bool = True
+    pred_cache_max_mb: float = 1024
+    pred_chunk_rows: int = 50000
+    pred_n_jobs: int = -1
 
 
 class LiveConfig(BaseModel):
     model_path: str = "models/orderbook_model.joblib"
+    # 训练该模型的 dataset bundle，用于取特征列表和 lookback；特征参数取自本配置的 dataset 段
+    dataset_path: str = "data/processed/dataset.pkl"
     max_position: float = 0.01
     max_single_loss: float = -0.002
     max_daily_loss: float = -0.01
@@ -83,17 +127,32 @@ class LiveConfig(BaseModel):
     take_profit: float = 0.003
     slippage: float = 0.0
     fee_rate: float = 0.0
+    # 组合模式：为空时只交易 binance.symbol
+    symbols: List[str] = Field(default_factory=list)
+    portfolio_max_daily_loss: Optional[float] = None
+    portfolio_max_notional: Optional[float] = None
+    batch_window_ms: float = 1.0
+    mock: bool = False
+    mock_ticks: Optional[int] = None
 
 class Config(BaseModel):
     app: AppConfig = AppConfig()
     paths: PathConfig = PathConfig()
     binance: BinanceConfig = BinanceConfig()
+    bus: BusConfig = BusConfig()
     lighter: LighterConfig = LighterConfig()
     dataset: DatasetConfig = DatasetConfig()
     train: TrainConfig = TrainConfig()
+    tune: TuneConfig = TuneConfig()
     backtest: BacktestConfig = BacktestConfig()
     live: LiveConfig = LiveConfig()
 
+    @model_validator(mode="after")
+    def check_bus_name(self):
+        if self.bus.enabled and self.bus.name and self.live.symbols:
+            raise ValueError("bus.name cannot be combined with live.symbols; per-symbol buses use lq_ob_<symbol>")
+        return self
+
 
 def _ensure_dirs(cfg: Config) -> None:
     for path in [cfg.paths.data_dir, cfg.paths.models_dir, cfg.paths.log_dir, cfg.paths.cache_dir]:
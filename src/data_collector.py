@@ -3,23 +3,41 @@ import csv
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List
-from src.exchange.binance_client import BinanceClient
+from src.exchange.orderbook_bus import make_depth_source
 from src.config import Config
 from src.utils.retry import async_retry
 
 
+def format_book_row(ob: Dict[str, Any], ts: float, top_levels: int, agg_depths: List[int]) -> Dict[str, Any]:
+    bids = sorted(ob["bids"].items(), key=lambda x: -x[0])[:top_levels]
+    asks = sorted(ob["asks"].items(), key=lambda x: x[0])[:top_levels]
+    best_bid = bids[0][0] if bids else 0.0
+    best_ask = asks[0][0] if asks else 0.0
+    mid = (best_bid + best_ask) / 2 if best_bid and best_ask else 0.0
+    row: Dict[str, Any] = {
+        "exchange_time": ob.get("event_time", 0),
+        "local_time": ts,
+        "best_bid": best_bid,
+        "best_ask": best_ask,
+        "mid": mid,
+    }
+    for i, (p, v) in enumerate(bids, 1):
+        row[f"bid_{i}_price"] = p
+        row[f"bid_{i}_vol"] = v
+    for i, (p, v) in enumerate(asks, 1):
+        row[f"ask_{i}_price"] = p
+        row[f"ask_{i}_vol"] = v
+    for depth in agg_depths:
+        row[f"bid_vol_top_{depth}"] = sum(v for _, v in bids[:depth])
+        row[f"ask_vol_top_{depth}"] = sum(v for _, v in asks[:depth])
+    return row
+
+
 class BinanceOrderBookCollector:
     def __init__(self, config: Config, logger) -> None:
         self.config = config
         self.logger = logger
-        self.client = BinanceClient(
-            symbol=config.binance.symbol,
-            depth=config.binance.depth_limit,
-            rest_base=config.binance.rest_base,
-            ws_base=config.binance.ws_base,
-            stream_interval=config.binance.stream_interval,
-            logger=logger,
-        )
+        self.client = make_depth_source(config, logger)
     async def _write_csv(self, rows: List[Dict[str, Any]], path: Path) -> None:
         if not rows:
             return
@@ -48,29 +66,7 @@ class BinanceOrderBookCollector:
                 buffer.clear()
             await asyncio.sleep(interval)
     def _format_row(self, ob: Dict[str, Any], ts: float) -> Dict[str, Any]:
-        bids = sorted(ob["bids"].items(), key=lambda x: -x[0])[: self.config.dataset.top_levels]
-        asks = sorted(ob["asks"].items(), key=lambda x: x[0])[: self.config.dataset.top_levels]
-        best_bid = bids[0][0] if bids else 0.0
-        best_ask = asks[0][0] if asks else 0.0
-        mid = (best_bid + best_ask) / 2 if best_bid and best_ask else 0.0
-        row: Dict[str, Any] = {
-            "exchange_time": ob.get("event_time", 0),
-            "local_time": ts,
-            "best_bid": best_bid,
-            "best_ask": best_ask,
-            "mid": mid,
-        }
-        for i, (p, v) in enumerate(bids, 1):
-            row[f"bid_{i}_price"] = p
-            row[f"bid_{i}_vol"] = v
-        for i, (p, v) in enumerate(asks, 1):
-            row[f"ask_{i}_price"] = p
-            row[f"ask_{i}_vol"] = v
-        for depth in self.config.dataset.agg_depths:
-            row[f"bid_vol_top_{depth}"] = sum(v for _, v in bids[:depth])
-            row[f"ask_vol_top_{depth}"] = sum(v for _, v in asks[:depth])
-        return row
-
+        return format_book_row(ob, ts, self.config.dataset.top_levels, self.config.dataset.agg_depths)
 
 if __name__ == "__main__":
     import yaml
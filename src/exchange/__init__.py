@@ -1 +1 @@
-__all__ = ["binance_client", "lighter_client"]
+__all__ = ["binance_client", "lighter_client", "orderbook_bus", "mock_exchange"]
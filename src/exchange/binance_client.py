@@ -1,6 +1,6 @@
 import asyncio
 import json
-from typing import Any, AsyncGenerator, Dict, Tuple
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 import httpx
 import websockets
 from src.utils.retry import async_retry
@@ -17,8 +17,8 @@ class BinanceClient:
         # trust_env=True 允许使用系统代理；http2=False 兼容部分环境；超时 10s
         self.session = httpx.AsyncClient(timeout=10, trust_env=True, http2=False)
     @async_retry(retries=3, delay=1.0, backoff=2.0)
-    async def get_orderbook_snapshot(self) -> Dict[str, Any]:
-        params = {"symbol": self.symbol, "limit": self.depth}
+    async def get_orderbook_snapshot(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        params = {"symbol": (symbol or self.symbol).upper(), "limit": self.depth}
         url = f"{self.rest_base}/fapi/v1/depth"  # TODO: 具体参数与字段请参考 Binance 官方文档（通过 MCP contxt7 查询）
         try:
             resp = await self.session.get(url, params=params)
@@ -75,3 +75,38 @@ class BinanceClient:
             except Exception as exc:
                 self.logger.error("Depth stream error: %s", exc, exc_info=True)
                 await asyncio.sleep(1)
+
+    async def combined_depth_stream(self, symbols: List[str]) -> AsyncGenerator[Tuple[str, Dict[str, Any]], None]:
+        # 多个 symbol 共用一条 combined stream 连接
+        symbols = [s.upper() for s in symbols]
+        streams = "/".join(f"{s.lower()}@depth@{self.stream_interval}" for s in symbols)
+        url = f"{self.ws_base}/stream?streams={streams}"
+        while True:
+            try:
+                last_ids: Dict[str, int] = {}
+                books: Dict[str, Dict[str, Dict[float, float]]] = {}
+                for sym in symbols:
+                    snapshot = await self.get_orderbook_snapshot(sym)
+                    last_ids[sym] = snapshot["lastUpdateId"]
+                    books[sym] = {"bids": snapshot["bids"].copy(), "asks": snapshot["asks"].copy()}
+                async with websockets.connect(url, ping_interval=180) as ws:
+                    async for msg in ws:
+                        data = json.loads(msg).get("data", {})
+                        sym = str(data.get("s", "")).upper()
+                        first_id = data.get("U")
+                        final_id = data.get("u")
+                        if sym not in books or final_id is None or first_id is None:
+                            continue
+                        if final_id <= last_ids[sym]:
+                            continue
+                        if first_id <= last_ids[sym] + 1 <= final_id:
+                            self._apply_diff(books[sym], data)
+                            last_ids[sym] = final_id
+                            yield sym, {
+                                "event_time": data.get("E"),
+                                "bids": books[sym]["bids"],
+                                "asks": books[sym]["asks"],
+                            }
+            except Exception as exc:
+                self.logger.error("Combined depth stream error: %s", exc, exc_info=True)
+                await asyncio.sleep(1)
@@ -0,0 +1,73 @@
+import asyncio
+import itertools
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+import numpy as np
+
+
+class MockBinanceClient:
+    """Random-walk order books with the same shape as ``BinanceClient`` streams."""
+
+    def __init__(self, symbols: List[str], logger, depth: int = 20, interval: float = 0.1, ticks: Optional[int] = None, seed: int = 42) -> None:
+        self.symbols = [s.upper() for s in symbols]
+        self.logger = logger
+        self.depth = depth
+        self.interval = interval
+        self.ticks = ticks
+        self.rng = np.random.default_rng(seed)
+        self.mids = {s: 100.0 * (i + 1) for i, s in enumerate(self.symbols)}
+
+    def _book(self, symbol: str) -> Dict[str, Any]:
+        mid = self.mids[symbol] * (1 + self.rng.normal(0, 0.0005))
+        self.mids[symbol] = mid
+        tick = mid * 1e-5
+        qty = self.rng.uniform(0.1, 2.0, size=(2, self.depth))
+        return {
+            "event_time": int(time.time() * 1000),
+            "bids": {mid - tick * (i + 1): float(qty[0, i]) for i in range(self.depth)},
+            "asks": {mid + tick * (i + 1): float(qty[1, i]) for i in range(self.depth)},
+        }
+
+    async def depth_stream(self) -> AsyncGenerator[Dict[str, Any], None]:
+        async for _, ob in self.combined_depth_stream(self.symbols[:1]):
+            yield ob
+
+    async def combined_depth_stream(self, symbols: List[str]) -> AsyncGenerator[Tuple[str, Dict[str, Any]], None]:
+        symbols = [s.upper() for s in symbols]
+        for n in itertools.count():
+            if self.ticks is not None and n >= self.ticks:
+                return
+            for sym in symbols:
+                yield sym, self._book(sym)
+            await asyncio.sleep(self.interval)
+
+
+class MockLighterClient:
+    """In-memory stand-in for ``LighterClient`` that fills every order immediately."""
+
+    def __init__(self, logger) -> None:
+        self.logger = logger
+        self.orders: List[Dict[str, Any]] = []
+        self.positions: Dict[str, float] = {}
+
+    async def get_balance(self) -> Dict[str, Any]:
+        return {"balance": 0.0}
+
+    async def get_position(self, symbol: str) -> Dict[str, Any]:
+        return {"symbol": symbol, "size": self.positions.get(symbol, 0.0)}
+
+    async def place_order(
+        self, symbol: str, side: str, size: float, order_type: str, price: Optional[float] = None, **kwargs
+    ) -> Dict[str, Any]:
+        order = {"order_id": str(len(self.orders) + 1), "symbol": symbol, "side": side, "size": size, "type": order_type, "price": price, "status": "filled"}
+        self.orders.append(order)
+        signed = size if side == "BUY" else -size
+        self.positions[symbol] = self.positions.get(symbol, 0.0) + signed
+        return order
+
+    async def cancel_order(self, order_id: str) -> Dict[str, Any]:
+        return {"order_id": order_id, "status": "cancelled"}
+
+    async def close_position(self, symbol: str, size: float) -> Dict[str, Any]:
+        side = "SELL" if size > 0 else "BUY"
+        return await self.place_order(symbol, side, abs(size), "MARKET")
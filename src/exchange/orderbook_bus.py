@@ -0,0 +1,325 @@
+import asyncio
+import heapq
+import time
+from collections.abc import Mapping
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from src.config import Config
+from src.exchange.binance_client import BinanceClient
+
+_MAGIC = 0x4C514F42  # "LQOB"
+# header: magic, levels, capacity, write_seq（已发布的总条数）, heartbeat（发布者最近一次存活时间）
+_HEADER = np.dtype(
+    [("magic", "<i8"), ("levels", "<i8"), ("capacity", "<i8"), ("write_seq", "<i8"), ("heartbeat", "<f8")]
+)
+_HEADER_SIZE = 64
+
+
+def _slot_dtype(levels: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("seq", "<i8"),
+            ("event_time", "<i8"),
+            ("n_bids", "<i8"),
+            ("n_asks", "<i8"),
+            ("bids", "<f8", (levels, 2)),
+            ("asks", "<f8", (levels, 2)),
+        ]
+    )
+
+
+def bus_name(config: Config, symbol: Optional[str] = None) -> str:
+    # bus.name 只对单 symbol 生效，按 symbol 查找的读者总是使用默认命名
+    if symbol is None and config.bus.name:
+        return config.bus.name
+    return f"lq_ob_{(symbol or config.binance.symbol).lower()}"
+
+
+def _map(buf, levels: int, capacity: int):
+    header = np.ndarray((), dtype=_HEADER, buffer=buf)
+    slots = np.ndarray((capacity,), dtype=_slot_dtype(levels), buffer=buf, offset=_HEADER_SIZE)
+    return header, slots
+
+
+class LevelView(Mapping):
+    """Read-only price -> qty mapping backed by a (levels, 2) array in shared memory."""
+
+    __slots__ = ("_levels", "_n")
+
+    def __init__(self, levels: np.ndarray, n: int) -> None:
+        self._levels = levels
+        self._n = n
+
+    def __getitem__(self, price: float) -> float:
+        idx = np.flatnonzero(self._levels[: self._n, 0] == price)
+        if len(idx) == 0:
+            raise KeyError(price)
+        return float(self._levels[idx[0], 1])
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.keys())
+
+    def keys(self) -> List[float]:
+        return self._levels[: self._n, 0].tolist()
+
+    def values(self) -> List[float]:
+        return self._levels[: self._n, 1].tolist()
+
+    def items(self) -> List[Tuple[float, float]]:
+        return [(p, q) for p, q in self._levels[: self._n].tolist()]
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._levels[: self._n]
+
+
+class OrderBookPublisher:
+    def __init__(self, config: Config, logger) -> None:
+        self.config = config
+        self.logger = logger
+        self.levels = config.bus.levels
+        self.capacity = config.bus.capacity
+        self.name = bus_name(config)
+        self.client = BinanceClient(
+            symbol=config.binance.symbol,
+            depth=config.binance.depth_limit,
+            rest_base=config.binance.rest_base,
+            ws_base=config.binance.ws_base,
+            stream_interval=config.binance.stream_interval,
+            logger=logger,
+        )
+        self.stale_after = config.bus.stale_after_s
+        self.shm: Optional[shared_memory.SharedMemory] = None
+
+    def open(self) -> None:
+        size = _HEADER_SIZE + _slot_dtype(self.levels).itemsize * self.capacity
+        try:
+            existing = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            existing = None
+        if existing is not None:
+            alive = False
+            if existing.size >= _HEADER_SIZE:
+                header = np.ndarray((), dtype=_HEADER, buffer=existing.buf)
+                alive = int(header["magic"]) == _MAGIC and time.time() - float(header["heartbeat"]) < self.stale_after
+                del header
+            existing.close()
+            if alive:
+                # 不是本进程创建的段，退出时不能让 resource_tracker 把它 unlink 掉
+                resource_tracker.unregister(existing._name, "shared_memory")
+                raise RuntimeError(f"Orderbook bus {self.name} is already being published")
+            self.logger.warning("Removing stale orderbook bus segment %s", self.name)
+            existing.unlink()
+        self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        self.header, self.slots = _map(self.shm.buf, self.levels, self.capacity)
+        self.slots["seq"] = 0
+        self.header["levels"] = self.levels
+        self.header["capacity"] = self.capacity
+        self.header["write_seq"] = 0
+        self.header["heartbeat"] = time.time()
+        # magic 最后写入，读者看到 magic 即说明布局字段已就绪
+        self.header["magic"] = _MAGIC
+
+    def close(self) -> None:
+        if self.shm is None:
+            return
+        # 清掉 magic，已连接的读者立即重连而不必等心跳超时
+        self.header["magic"] = 0
+        del self.header, self.slots
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def publish(self, ob: Dict[str, Any]) -> None:
+        gen = int(self.header["write_seq"])
+        slot = self.slots[gen % self.capacity]
+        bids = heapq.nlargest(self.levels, ob["bids"].items())
+        asks = heapq.nsmallest(self.levels, ob["asks"].items())
+        # seqlock：奇数表示写入中，偶数 2*(gen+1) 表示第 gen 条已提交
+        slot["seq"] = 2 * gen + 1
+        slot["event_time"] = ob.get("event_time") or 0
+        slot["n_bids"] = len(bids)
+        slot["n_asks"] = len(asks)
+        if bids:
+            slot["bids"][: len(bids)] = bids
+        if asks:
+            slot["asks"][: len(asks)] = asks
+        slot["seq"] = 2 * gen + 2
+        self.header["write_seq"] = gen + 1
+        self.header["heartbeat"] = time.time()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self.header["heartbeat"] = time.time()
+            await asyncio.sleep(self.stale_after / 3)
+
+    async def run(self) -> None:
+        self.open()
+        self.logger.info(
+            "Publishing %s top-%s levels to shared memory %s (%s slots)",
+            self.config.binance.symbol,
+            self.levels,
+            self.name,
+            self.capacity,
+        )
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            async for ob in self.client.depth_stream():
+                self.publish(ob)
+        finally:
+            heartbeat.cancel()
+            self.close()
+
+
+class OrderBookReader:
+    def __init__(self, config: Config, logger, symbol: Optional[str] = None) -> None:
+        self.config = config
+        self.logger = logger
+        self.name = bus_name(config, symbol)
+        self.poll_interval = config.bus.poll_interval_ms / 1000.0
+        self.stale_after = config.bus.stale_after_s
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self._retired: List[shared_memory.SharedMemory] = []
+        self.last_gen = -1
+
+    async def _attach(self) -> None:
+        while True:
+            try:
+                shm = shared_memory.SharedMemory(name=self.name)
+            except FileNotFoundError:
+                self.logger.info("Waiting for orderbook bus %s", self.name)
+                await asyncio.sleep(1)
+                continue
+            # 读者不拥有该段，避免 resource_tracker 在进程退出时把它 unlink 掉
+            resource_tracker.unregister(shm._name, "shared_memory")
+            header = np.ndarray((), dtype=_HEADER, buffer=shm.buf)
+            if int(header["magic"]) != _MAGIC or time.time() - float(header["heartbeat"]) >= self.stale_after:
+                del header
+                shm.close()
+                await asyncio.sleep(1)
+                continue
+            self.levels = int(header["levels"])
+            self.capacity = int(header["capacity"])
+            del header
+            self.shm = shm
+            self.header, self.slots = _map(shm.buf, self.levels, self.capacity)
+            return
+
+    def overwritten(self, shm: Optional[shared_memory.SharedMemory], gen: int) -> bool:
+        # 只能校验当前映射的段；重连后旧段的视图无法再校验
+        if shm is None or shm is not self.shm:
+            return False
+        return int(self.slots[gen % self.capacity]["seq"]) != 2 * gen + 2
+
+    def _stale(self) -> bool:
+        return int(self.header["magic"]) != _MAGIC or time.time() - float(self.header["heartbeat"]) >= self.stale_after
+
+    def close(self) -> None:
+        if self.shm is not None:
+            del self.header, self.slots
+            self._retired.append(self.shm)
+            self.shm = None
+        retired, self._retired = self._retired, []
+        for shm in retired:
+            try:
+                shm.close()
+            except BufferError:
+                # 消费者仍持有上一帧的视图，等下次 close 再释放
+                self._retired.append(shm)
+
+    async def depth_stream(self) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield books shaped like ``BinanceClient.depth_stream`` without copying level data.
+
+        The yielded mappings are views into the ring slot: they stay valid for the next
+        ``bus.capacity - 1`` publishes. A consumer holding a frame longer than that sees
+        another frame's levels under the copied ``event_time``; this is only detected
+        afterwards and logged as a warning.
+        """
+        await self._attach()
+        next_gen = int(self.header["write_seq"])
+        try:
+            while True:
+                write_seq = int(self.header["write_seq"])
+                if write_seq <= next_gen:
+                    if self._stale():
+                        # 发布者退出或重启后旧段不再更新，重新连接到新段
+                        self.logger.warning("Orderbook bus %s publisher gone, re-attaching", self.name)
+                        self.close()
+                        await self._attach()
+                        next_gen = int(self.header["write_seq"])
+                        continue
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                if write_seq - next_gen >= self.capacity:
+                    self.logger.warning("Orderbook bus reader lagged %s updates, skipping ahead", write_seq - next_gen)
+                    next_gen = write_seq - 1
+                gen = next_gen
+                slot = self.slots[gen % self.capacity]
+                committed = 2 * gen + 2
+                seq = int(slot["seq"])
+                if seq != committed:
+                    if seq > committed:
+                        # 槽位已被下一圈覆盖，跳到最新
+                        next_gen = int(self.header["write_seq"]) - 1
+                    await asyncio.sleep(0)
+                    continue
+                self.last_gen = gen
+                yield {
+                    "event_time": int(slot["event_time"]),
+                    "bids": LevelView(slot["bids"], int(slot["n_bids"])),
+                    "asks": LevelView(slot["asks"], int(slot["n_asks"])),
+                }
+                if int(slot["seq"]) != committed:
+                    self.logger.warning("Orderbook bus slot %s overwritten while in use", gen % self.capacity)
+                next_gen = gen + 1
+        finally:
+            self.close()
+
+
+class CombinedOrderBookReader:
+    def __init__(self, config: Config, logger) -> None:
+        self.config = config
+        self.logger = logger
+
+    async def combined_depth_stream(self, symbols: List[str]) -> AsyncGenerator[Tuple[str, Dict[str, Any]], None]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=len(symbols))
+
+        async def pump(symbol: str) -> None:
+            reader = OrderBookReader(self.config, self.logger, symbol)
+            async for ob in reader.depth_stream():
+                await queue.put((symbol, ob, reader, reader.shm, reader.last_gen))
+
+        tasks = [asyncio.create_task(pump(s.upper())) for s in symbols]
+        try:
+            while True:
+                symbol, ob, reader, shm, gen = await queue.get()
+                yield symbol, ob
+                # pump 在入队后就继续读下一帧，所以覆盖检查放在消费者处理完之后
+                if reader.overwritten(shm, gen):
+                    self.logger.warning("Orderbook bus slot for %s overwritten while in use", symbol)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def make_depth_source(config: Config, logger):
+    if config.bus.enabled:
+        return OrderBookReader(config, logger)
+    return BinanceClient(
+        symbol=config.binance.symbol,
+        depth=config.binance.depth_limit,
+        rest_base=config.binance.rest_base,
+        ws_base=config.binance.ws_base,
+        stream_interval=config.binance.stream_interval,
+        logger=logger,
+    )
+
+
+def make_combined_depth_source(config: Config, logger):
+    if config.bus.enabled:
+        return CombinedOrderBookReader(config, logger)
+    return make_depth_source(config, logger)
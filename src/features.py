@@ -1,24 +1,124 @@
+import json
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Dict, List, Tuple
 import numpy as np
 import pandas as pd
 import joblib
-from src.config import Config
+from src.config import Config, DatasetConfig
 
 
-def _compute_lags(df: pd.DataFrame, cols, lags):
-    for col in cols:
-        for l in lags:
-            df[f"{col}_lag_{l}"] = df[col].shift(l)
-    return df
+@dataclass
+class FeatureSpec:
+    name: str
+    fn: Callable[[pd.DataFrame], pd.Series]
+    deps: Tuple[str, ...] = ()
+    lookback: int = 0
+    cost: float = field(default=0.0, compare=False)
 
 
-def _compute_roll(df: pd.DataFrame, cols, windows):
-    for col in cols:
-        for w in windows:
-            df[f"{col}_roll_mean_{w}"] = df[col].rolling(w).mean()
-            df[f"{col}_roll_std_{w}"] = df[col].rolling(w).std()
-    return df
+def _ret(h):
+    return lambda df: df["mid"].pct_change(h)
+
+
+def _lag(col, l):
+    return lambda df: df[col].shift(l)
+
+
+def _roll_mean(col, w):
+    return lambda df: df[col].rolling(w).mean()
+
+
+def _roll_std(col, w):
+    return lambda df: df[col].rolling(w).std()
+
+
+def _imbalance(depth):
+    bid, ask = f"bid_vol_top_{depth}", f"ask_vol_top_{depth}"
+    return lambda df: (df[bid] - df[ask]) / (df[bid] + df[ask] + 1e-9)
+
+
+def _raw_columns(cfg: DatasetConfig) -> List[str]:
+    # 与 BinanceOrderBookCollector._format_row 写出的列一致
+    cols = ["exchange_time", "local_time", "best_bid", "best_ask", "mid"]
+    for i in range(1, cfg.top_levels + 1):
+        cols += [f"bid_{i}_price", f"bid_{i}_vol", f"ask_{i}_price", f"ask_{i}_vol"]
+    for depth in cfg.agg_depths:
+        cols += [f"bid_vol_top_{depth}", f"ask_vol_top_{depth}"]
+    return cols
+
+
+def build_registry(cfg: DatasetConfig) -> Dict[str, FeatureSpec]:
+    specs = [
+        FeatureSpec("spread", lambda df: df["best_ask"] - df["best_bid"], ("best_ask", "best_bid")),
+        FeatureSpec("rel_spread", lambda df: df["spread"] / df["mid"], ("spread", "mid")),
+    ]
+    for depth in cfg.agg_depths:
+        specs.append(FeatureSpec(f"imbalance_{depth}", _imbalance(depth), (f"bid_vol_top_{depth}", f"ask_vol_top_{depth}")))
+    for h in cfg.return_horizons:
+        specs.append(FeatureSpec(f"ret_{h}", _ret(h), ("mid",), lookback=h))
+    ret_cols = [f"ret_{h}" for h in cfg.return_horizons]
+    lag_cols = cfg.lag_cols if cfg.lag_cols is not None else ret_cols + ["spread", "rel_spread"]
+    shortest = [f"ret_{min(cfg.return_horizons)}"] if cfg.return_horizons else []
+    roll_cols = cfg.roll_cols if cfg.roll_cols is not None else shortest + ["spread"]
+    known = {s.name for s in specs} | set(_raw_columns(cfg))
+    for col in lag_cols + roll_cols:
+        if col not in known:
+            raise ValueError(f"Lag/rolling source {col} is neither a registered feature nor a raw column")
+    for col in lag_cols:
+        for l in cfg.lag_steps:
+            specs.append(FeatureSpec(f"{col}_lag_{l}", _lag(col, l), (col,), lookback=l))
+    for col in roll_cols:
+        for w in cfg.roll_windows:
+            specs.append(FeatureSpec(f"{col}_roll_mean_{w}", _roll_mean(col, w), (col,), lookback=w - 1))
+            specs.append(FeatureSpec(f"{col}_roll_std_{w}", _roll_std(col, w), (col,), lookback=w - 1))
+    return {s.name: s for s in specs}
+
+
+def resolve_features(registry: Dict[str, FeatureSpec], names: List[str]) -> List[str]:
+    # 依赖拓扑排序；不在注册表里的依赖视为原始输入列
+    order: List[str] = []
+    state: Dict[str, int] = {}
+
+    def visit(name: str) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"Feature dependency cycle at {name}")
+        state[name] = 1
+        for dep in registry[name].deps:
+            if dep in registry:
+                visit(dep)
+        state[name] = 2
+        order.append(name)
+
+    for name in names:
+        if name not in registry:
+            raise ValueError(f"Unknown feature {name}")
+        visit(name)
+    return order
+
+
+def total_lookback(registry: Dict[str, FeatureSpec], name: str) -> int:
+    spec = registry[name]
+    return spec.lookback + max((total_lookback(registry, d) for d in spec.deps if d in registry), default=0)
+
+
+def compute_features(df: pd.DataFrame, registry: Dict[str, FeatureSpec], names: List[str]) -> Dict[str, float]:
+    profile: Dict[str, float] = {}
+    for name in resolve_features(registry, names):
+        spec = registry[name]
+        start = time.perf_counter()
+        df[name] = spec.fn(df)
+        spec.cost = time.perf_counter() - start
+        profile[name] = spec.cost
+    return profile
+
+def profile_path(dataset_path) -> Path:
+    p = Path(dataset_path)
+    return p.with_name(f"{p.stem}.profile.json")
+
 
 def build_dataset(config: Config, logger) -> Tuple[np.ndarray, np.ndarray]:
     input_paths = [Path(p) for p in config.dataset.input_paths]
@@ -33,20 +133,13 @@ def build_dataset(config: Config, logger) -> Tuple[np.ndarray, np.ndarray]:
     df = pd.concat(frames, ignore_index=True)
     df.sort_values("local_time", inplace=True)
 
-    df["spread"] = df["best_ask"] - df["best_bid"]
-    df["rel_spread"] = df["spread"] / df["mid"]
-    for depth in config.dataset.agg_depths:
-        df[f"imbalance_{depth}"] = (df[f"bid_vol_top_{depth}"] - df[f"ask_vol_top_{depth}"]) / (
-            df[f"bid_vol_top_{depth}"] + df[f"ask_vol_top_{depth}"] + 1e-9
-        )
-
-    df["ret_1"] = df["mid"].pct_change(1)
-    df["ret_5"] = df["mid"].pct_change(5)
-    df["ret_10"] = df["mid"].pct_change(10)
-    df["ret_50"] = df["mid"].pct_change(50)
-
-    df = _compute_lags(df, ["ret_1", "ret_5", "ret_10", "ret_50", "spread", "rel_spread"], config.dataset.lag_steps)
-    df = _compute_roll(df, ["ret_1", "spread"], [5, 10, 20])
+    registry = build_registry(config.dataset)
+    feature_cols = list(registry.keys()) if config.dataset.features is None else list(config.dataset.features)
+    if not feature_cols:
+        raise ValueError("dataset.features is empty")
+    profile = compute_features(df, registry, feature_cols)
+    slowest = sorted(profile.items(), key=lambda x: -x[1])[:5]
+    logger.info("Computed %s features (%s requested) in %.3fs, slowest: %s", len(profile), len(feature_cols), sum(profile.values()), slowest)
 
     future_h = config.dataset.future_horizon
     df["future_ret"] = df["mid"].shift(-future_h) / df["mid"] - 1
@@ -61,14 +154,17 @@ def build_dataset(config: Config, logger) -> Tuple[np.ndarray, np.ndarray]:
             return 0
         df["label"] = df["future_ret"].apply(label_func)
 
-    df.dropna(inplace=True)
-    feature_cols = [c for c in df.columns if c not in {"label", "future_ret"} and not c.startswith("ask_") and not c.startswith("bid_")]
+    df.dropna(subset=feature_cols + ["future_ret"], inplace=True)
     X = df[feature_cols].values
     y = df["label"].values
 
     Path(config.paths.cache_dir).mkdir(parents=True, exist_ok=True)
     out_path = Path(config.dataset.output_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump({"X": X, "y": y, "features": feature_cols}, out_path)
+    lookback = max((total_lookback(registry, n) for n in feature_cols), default=0)
+    joblib.dump({"X": X, "y": y, "features": feature_cols, "lookback": lookback}, out_path)
+    # 耗时每次构建都不同，单独写 sidecar，保证相同数据构建出的 dataset 文件字节一致
+    with open(profile_path(out_path), "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
     logger.info("Built dataset: %s samples, %s features -> %s", X.shape[0], X.shape[1], out_path)
     return X, y
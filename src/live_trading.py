@@ -1,33 +1,76 @@
 import asyncio
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+import joblib
 import numpy as np
+import pandas as pd
 from src.model import load_model
-from src.config import Config
-from src.exchange.binance_client import BinanceClient
+from src.config import Config, DatasetConfig
+from src.data_collector import format_book_row
+from src.exchange.orderbook_bus import make_depth_source
 from src.exchange.lighter_client import LighterClient
+from src.features import build_registry, compute_features, resolve_features, total_lookback
 from src.utils.retry import async_retry
 
 
+class LiveFeatureBuilder:
+    """Rebuilds the trained feature row for each tick from a rolling window of ``lookback + 1`` ticks."""
+
+    def __init__(self, cfg: DatasetConfig, features: List[str], lookback: int) -> None:
+        self.cfg = cfg
+        self.features = list(features)
+        self.registry = build_registry(cfg)
+        resolve_features(self.registry, self.features)
+        self.rows: deque = deque(maxlen=lookback + 1)
+
+    def update(self, ob) -> Tuple[float, Optional[np.ndarray]]:
+        row = format_book_row(ob, time.time(), self.cfg.top_levels, self.cfg.agg_depths)
+        self.rows.append(row)
+        if len(self.rows) < self.rows.maxlen:
+            # 预热期历史不足，特征不完整
+            return row["mid"], None
+        df = pd.DataFrame(list(self.rows))
+        compute_features(df, self.registry, self.features)
+        feat = df[self.features].to_numpy(dtype=float)[-1:]
+        if not np.isfinite(feat).all():
+            return row["mid"], None
+        return row["mid"], feat
+
+
+def load_live_features(config: Config) -> Tuple[List[str], int]:
+    # 特征列表与 lookback 取自训练所用的 dataset bundle
+    bundle = joblib.load(config.live.dataset_path)
+    features = list(bundle["features"])
+    lookback = bundle.get("lookback")
+    if lookback is None:
+        registry = build_registry(config.dataset)
+        lookback = max((total_lookback(registry, n) for n in features), default=0)
+    return features, int(lookback)
+
+
+def _check_model_inputs(model, features: List[str]) -> None:
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is not None and n_features != len(features):
+        raise ValueError(f"Model expects {n_features} features but live.dataset_path lists {len(features)}")
+
+
 async def run_live_trading(config: Config, logger) -> None:
     model = load_model(config.live.model_path)
-    binance = BinanceClient(
-        symbol=config.binance.symbol,
-        depth=config.binance.depth_limit,
-        rest_base=config.binance.rest_base,
-        ws_base=config.binance.ws_base,
-        stream_interval=config.binance.stream_interval,
-        logger=logger,
-    )
+    features, lookback = load_live_features(config)
+    _check_model_inputs(model, features)
+    builder = LiveFeatureBuilder(config.dataset, features, lookback)
+    binance = make_depth_source(config, logger)
     lighter = LighterClient(config.lighter, logger)
     position = 0.0
     entry_price = 0.0
     daily_pnl = 0.0
     async for ob in binance.depth_stream():
-        best_bid = max(ob["bids"].keys())
-        best_ask = min(ob["asks"].keys())
-        mid = (best_bid + best_ask) / 2
-        spread = best_ask - best_bid
-        feat = np.array([[spread, spread / mid, ob.get("event_time", 0) % 86400]]).astype(float)
-        prob = model.predict_proba(feat)[0, -1] if hasattr(model, "predict_proba") else model.predict(feat)[0]
+        mid, feat = builder.update(ob)
+        if feat is None:
+            prob = None
+        else:
+            prob = model.predict_proba(feat)[0, -1] if hasattr(model, "predict_proba") else model.predict(feat)[0]
 
         if daily_pnl <= config.live.max_daily_loss:
             logger.warning("Daily loss limit reached, only flattening positions")
@@ -38,7 +81,9 @@ async def run_live_trading(config: Config, logger) -> None:
             continue
 
         if position == 0:
-            if prob > config.live.p_buy:
+            if prob is None:
+                pass
+            elif prob > config.live.p_buy:
                 res = await lighter.place_order(config.binance.symbol, "BUY", config.live.max_position, "MARKET")
                 logger.info("Open long: %s", res)
                 position = config.live.max_position
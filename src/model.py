@@ -1,9 +1,12 @@
+import json
+from typing import List
 import joblib
 import numpy as np
+import yaml
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import precision_score, recall_score, f1_score, roc_auc_score
-from src.features import build_dataset
+from src.features import build_dataset, build_registry, profile_path, resolve_features
 from src.config import Config
 
 
@@ -11,26 +14,34 @@ def _train_val_split(X, y, ratio: float):
     split = int(len(X) * ratio)
     return X[:split], y[:split], X[split:], y[split:]
 
-def train_model(config: Config, logger) -> None:
-    data = build_dataset(config, logger)
-    X, y = data
-    X_train, y_train, X_val, y_val = _train_val_split(X, y, config.train.train_ratio)
+def _make_model(model_type: str, params: dict):
+    if model_type == "logistic_regression":
+        return LogisticRegression(**{"max_iter": 1000, **params})
+    return RandomForestClassifier(**params)
 
-    if config.train.model_type == "logistic_regression":
-        model = LogisticRegression(max_iter=1000)
-    else:
-        model = RandomForestClassifier(**config.train.model_params)
 
-    model.fit(X_train, y_train)
+def _evaluate(model, X_val, y_val) -> dict:
     preds = model.predict(X_val)
-    proba = model.predict_proba(X_val)[:, -1] if hasattr(model, "predict_proba") else None
-
-    metrics = {
+    proba = model.predict_proba(X_val) if hasattr(model, "predict_proba") else None
+    # 多分类 AUC 需要完整的概率矩阵，且验证集里的类别都要在训练时见过
+    multi = proba is not None and len(set(y_val)) > 2 and set(y_val) <= set(model.classes_)
+    return {
         "precision": precision_score(y_val, preds, average="macro", zero_division=0),
         "recall": recall_score(y_val, preds, average="macro", zero_division=0),
         "f1": f1_score(y_val, preds, average="macro", zero_division=0),
-        "auc": roc_auc_score(y_val, proba, multi_class="ovr") if proba is not None and len(set(y_val)) > 2 else None,
+        "auc": roc_auc_score(y_val, proba, multi_class="ovr", labels=model.classes_) if multi else None,
     }
+
+
+def train_model(config: Config, logger) -> None:
+    data = build_dataset(config, logger)
+    X, y = data
+    X_train, y_train, X_val, y_val = _train_val_split(X, y, config.train.train_ratio)
+
+    model = _make_model(config.train.model_type, config.train.model_params)
+
+    model.fit(X_train, y_train)
+    metrics = _evaluate(model, X_val, y_val)
     logger.info("Training completed. Metrics: %s", metrics)
 
     out_path = config.train.model_output
@@ -43,3 +54,42 @@ def load_model(path: str):
         return joblib.load(path)
     except Exception as exc:
         raise RuntimeError(f"Failed to load model {path}: {exc}") from exc
+
+
+def _importances(model) -> np.ndarray:
+    if hasattr(model, "feature_importances_"):
+        imp = np.asarray(model.feature_importances_, dtype=float)
+    elif hasattr(model, "coef_"):
+        imp = np.abs(np.atleast_2d(model.coef_)).mean(axis=0)
+    else:
+        raise RuntimeError(f"Model {type(model).__name__} exposes no feature importances")
+    total = imp.sum()
+    return imp / total if total > 0 else imp
+
+
+def prune_features(config: Config, logger, config_path: str, output_path: str) -> List[str]:
+    bundle = joblib.load(config.dataset.output_path)
+    features = bundle["features"]
+    model = load_model(config.train.model_output)
+    imp = _importances(model)
+    if len(imp) != len(features):
+        raise RuntimeError(f"Model has {len(imp)} inputs but dataset has {len(features)} features")
+    kept = [f for f, v in zip(features, imp) if v >= config.train.prune_threshold]
+    if not kept:
+        raise ValueError(f"All {len(features)} features fall below prune_threshold {config.train.prune_threshold}")
+    dropped = sorted(((f, float(v)) for f, v in zip(features, imp) if v < config.train.prune_threshold), key=lambda x: x[1])
+    prof_path = profile_path(config.dataset.output_path)
+    profile = json.loads(prof_path.read_text(encoding="utf-8")) if prof_path.exists() else {}
+    # 被保留特征依赖的列仍然要计算，只统计真正不再计算的部分
+    registry = build_registry(config.dataset)
+    skipped = set(resolve_features(registry, features)) - set(resolve_features(registry, kept))
+    saved = sum(profile.get(f, 0.0) for f in skipped)
+    logger.info("Pruning %s/%s features below importance %s (saves ~%.3fs build time): %s", len(dropped), len(features), config.train.prune_threshold, saved, dropped)
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    data.setdefault("dataset", {})["features"] = kept
+    with open(output_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
+    logger.info("Pruned config with %s features saved to %s", len(kept), output_path)
+    return kept
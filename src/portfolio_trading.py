@@ -0,0 +1,194 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+import numpy as np
+from src.model import load_model
+from src.config import Config
+from src.exchange.lighter_client import LighterClient
+from src.exchange.mock_exchange import MockBinanceClient, MockLighterClient
+from src.exchange.orderbook_bus import make_combined_depth_source
+from src.live_trading import LiveFeatureBuilder, _check_model_inputs, load_live_features
+
+
+@dataclass
+class SymbolState:
+    symbol: str
+    position: float = 0.0
+    entry_price: float = 0.0
+    daily_pnl: float = 0.0
+    last_mid: float = 0.0
+
+
+class InferenceBatcher:
+    """Collects feature rows from symbols that tick together into one model call."""
+
+    def __init__(self, model, window: float) -> None:
+        self.model = model
+        self.window = window
+        self.pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+
+    async def predict(self, row: np.ndarray) -> float:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        if not self.pending:
+            if self.window > 0:
+                loop.call_later(self.window, self._flush)
+            else:
+                loop.call_soon(self._flush)
+        self.pending.append((row, fut))
+        return await fut
+
+    def _flush(self) -> None:
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        X = np.vstack([row for row, _ in batch])
+        try:
+            if hasattr(self.model, "predict_proba"):
+                probs = self.model.predict_proba(X)[:, -1]
+            else:
+                probs = self.model.predict(X)
+        except Exception as exc:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for (_, fut), p in zip(batch, probs):
+            if not fut.done():
+                fut.set_result(float(p))
+
+
+class PortfolioTrader:
+    def __init__(self, config: Config, logger, model, binance, lighter, features: List[str], lookback: int) -> None:
+        _check_model_inputs(model, features)
+        self.config = config
+        self.logger = logger
+        self.binance = binance
+        self.lighter = lighter
+        self.symbols = [s.upper() for s in (config.live.symbols or [config.binance.symbol])]
+        self.states: Dict[str, SymbolState] = {s: SymbolState(s) for s in self.symbols}
+        self.builders = {s: LiveFeatureBuilder(config.dataset, features, lookback) for s in self.symbols}
+        self.batcher = InferenceBatcher(model, config.live.batch_window_ms / 1000.0)
+        live = config.live
+        self.portfolio_max_daily_loss = (
+            live.portfolio_max_daily_loss if live.portfolio_max_daily_loss is not None else live.max_daily_loss
+        )
+        self.portfolio_max_notional = live.portfolio_max_notional
+
+    def portfolio_pnl(self) -> float:
+        return sum(s.daily_pnl for s in self.states.values())
+
+    def portfolio_notional(self) -> float:
+        return sum(abs(s.position) * s.last_mid for s in self.states.values())
+
+    async def _flatten(self, state: SymbolState) -> None:
+        if state.position != 0:
+            res = await self.lighter.close_position(state.symbol, state.position)
+            self.logger.info("[%s] Flatten position: %s", state.symbol, res)
+            state.position = 0.0
+
+    async def _open(self, state: SymbolState, side: str, mid: float) -> None:
+        live = self.config.live
+        size = live.max_position
+        if self.portfolio_max_notional is not None and self.portfolio_notional() + size * mid > self.portfolio_max_notional:
+            self.logger.debug("[%s] Portfolio notional limit reached, skip %s", state.symbol, side)
+            return
+        # 先占用仓位额度，避免其他 symbol 在下单 await 期间超限
+        state.position = size if side == "BUY" else -size
+        state.entry_price = mid
+        res = await self.lighter.place_order(state.symbol, side, size, "MARKET")
+        if isinstance(res, dict) and res.get("error"):
+            self.logger.warning("[%s] Open %s failed: %s", state.symbol, side, res)
+            state.position = 0.0
+            return
+        self.logger.info("[%s] Open %s: %s", state.symbol, "long" if side == "BUY" else "short", res)
+
+    async def _on_tick(self, state: SymbolState, ob) -> None:
+        live = self.config.live
+        mid, feat = self.builders[state.symbol].update(ob)
+        state.last_mid = mid
+        prob = None if feat is None else await self.batcher.predict(feat)
+
+        if state.daily_pnl <= live.max_daily_loss:
+            self.logger.warning("[%s] Daily loss limit reached, only flattening positions", state.symbol)
+            await self._flatten(state)
+            return
+        if self.portfolio_pnl() <= self.portfolio_max_daily_loss:
+            self.logger.warning("Portfolio daily loss limit reached, only flattening positions")
+            await self._flatten(state)
+            return
+
+        if state.position == 0:
+            if prob is None:
+                pass
+            elif prob > live.p_buy:
+                await self._open(state, "BUY", mid)
+            elif prob < 1 - live.p_sell:
+                await self._open(state, "SELL", mid)
+        else:
+            pnl = (mid - state.entry_price) / state.entry_price * state.position
+            if pnl <= live.max_single_loss or pnl >= live.take_profit:
+                side = "SELL" if state.position > 0 else "BUY"
+                res = await self.lighter.place_order(state.symbol, side, abs(state.position), "MARKET")
+                self.logger.info("[%s] Close position: %s", state.symbol, res)
+                state.daily_pnl += pnl
+                state.position = 0.0
+
+    async def _symbol_task(self, state: SymbolState, queue: asyncio.Queue) -> None:
+        while True:
+            ob = await queue.get()
+            if ob is None:
+                return
+            await self._on_tick(state, ob)
+
+    async def _feed(self, queues: Dict[str, asyncio.Queue]) -> None:
+        async for symbol, ob in self.binance.combined_depth_stream(self.symbols):
+            queue = queues.get(symbol)
+            if queue is None:
+                continue
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(ob)
+            await asyncio.sleep(0)
+        for queue in queues.values():
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    async def run(self) -> Dict[str, SymbolState]:
+        # 每个 symbol 只保留最新一帧，处理慢时丢弃中间帧
+        queues = {s: asyncio.Queue(maxsize=1) for s in self.symbols}
+        tasks = {asyncio.create_task(self._symbol_task(self.states[s], queues[s])): s for s in self.symbols}
+        feed = asyncio.create_task(self._feed(queues))
+        tasks[feed] = "feed"
+        self.logger.info("Starting portfolio trading for %s", self.symbols)
+        try:
+            # 任一任务异常即停止整个组合，避免某个 symbol 悄悄停止交易
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                exc = task.exception()
+                if exc is not None:
+                    self.logger.error("Portfolio task %s failed, stopping", tasks[task], exc_info=exc)
+                    raise exc
+        finally:
+            for task in tasks:
+                task.cancel()
+        self.logger.info(
+            "Portfolio trading stopped, daily pnl %.6f: %s",
+            self.portfolio_pnl(),
+            {s: st.daily_pnl for s, st in self.states.items()},
+        )
+        return self.states
+
+
+async def run_portfolio_trading(config: Config, logger, binance=None, lighter=None) -> Dict[str, SymbolState]:
+    model = load_model(config.live.model_path)
+    symbols = config.live.symbols or [config.binance.symbol]
+    if config.live.mock:
+        binance = binance or MockBinanceClient(symbols, logger, ticks=config.live.mock_ticks)
+        lighter = lighter or MockLighterClient(logger)
+    binance = binance or make_combined_depth_source(config, logger)
+    lighter = lighter or LighterClient(config.lighter, logger)
+    features, lookback = load_live_features(config)
+    trader = PortfolioTrader(config, logger, model, binance, lighter, features, lookback)
+    return await trader.run()
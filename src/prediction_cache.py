@@ -0,0 +1,114 @@
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+import numpy as np
+from joblib import Parallel, delayed
+from src.config import Config
+from src.model import load_model
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _predict_chunk(model, X) -> np.ndarray:
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(X)[:, -1]
+    return model.predict(X)
+
+
+_STALE_TMP_SECONDS = 3600
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _mtime(path: Path) -> float:
+    # 其他进程可能在遍历期间淘汰文件，缺失的按最旧处理
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _evict(cache_dir: Path, max_bytes: int, keep: Path, logger) -> None:
+    # 崩溃残留的临时文件：超过一小时未修改的直接清理，其余（可能正被其他进程写入）计入总量
+    now = time.time()
+    for p in cache_dir.glob("*.npy.tmp"):
+        try:
+            if now - p.stat().st_mtime > _STALE_TMP_SECONDS:
+                p.unlink()
+                logger.info("Removed stale prediction cache temp file %s", p.name)
+        except FileNotFoundError:
+            pass
+    tmp_bytes = sum(_size(p) for p in cache_dir.glob("*.npy.tmp"))
+    files: List[Path] = sorted(cache_dir.glob("*.npy"), key=_mtime)
+    total = tmp_bytes + sum(_size(p) for p in files)
+    for p in files:
+        if total <= max_bytes:
+            break
+        if p == keep:
+            continue
+        total -= _size(p)
+        p.unlink(missing_ok=True)
+        logger.info("Evicted prediction cache %s", p.name)
+
+
+def cached_predictions(cfg: Config, X: np.ndarray, logger) -> np.ndarray:
+    bt = cfg.backtest
+    if not bt.pred_cache:
+        return _predict_chunk(load_model(bt.model_path), X)
+
+    cache_dir = Path(cfg.paths.cache_dir) / "predictions"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    key = f"{_file_hash(bt.model_path)[:16]}_{_file_hash(bt.dataset_path)[:16]}"
+    path = cache_dir / f"{key}.npy"
+    try:
+        proba = np.load(path, mmap_mode="r")
+        if len(proba) == len(X):
+            # 命中时刷新 mtime，淘汰按最近使用排序
+            os.utime(path)
+            logger.info("Prediction cache hit %s", path.name)
+            return proba
+        logger.warning("Prediction cache %s has %s rows, expected %s; recomputing", path.name, len(proba), len(X))
+    except FileNotFoundError:
+        # 未缓存，或在检查期间被其他进程淘汰
+        pass
+
+    model = load_model(bt.model_path)
+    # 外层按行分块并行，模型内部改为单线程，避免线程数叠加
+    if hasattr(model, "get_params") and "n_jobs" in model.get_params():
+        model.set_params(n_jobs=1)
+    chunk = max(1, bt.pred_chunk_rows)
+    bounds = [(i, min(i + chunk, len(X))) for i in range(0, len(X), chunk)]
+    logger.info("Prediction cache miss %s, predicting %s rows in %s chunks", path.name, len(X), len(bounds))
+    parts = Parallel(n_jobs=bt.pred_n_jobs, prefer="threads")(delayed(_predict_chunk)(model, X[a:b]) for a, b in bounds)
+
+    # 每次写入用独立的临时文件，并发 miss 时各写各的，最后 os.replace 原子发布
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f"{key}.", suffix=".npy.tmp")
+    os.close(fd)
+    os.chmod(tmp_path, 0o644)
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=(len(X),))
+    for (a, b), part in zip(bounds, parts):
+        out[a:b] = part
+    out.flush()
+    del out
+    os.replace(tmp_path, path)
+    _evict(cache_dir, int(bt.pred_cache_max_mb * 1024 * 1024), path, logger)
+    try:
+        return np.load(path, mmap_mode="r")
+    except FileNotFoundError:
+        # 刚发布就被其他进程淘汰，直接用内存中的结果
+        logger.warning("Prediction cache %s evicted before reload, using in-memory predictions", path.name)
+        return np.concatenate(parts).astype(np.float64, copy=False)
@@ -0,0 +1,149 @@
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+import joblib
+import numpy as np
+import yaml
+from src.config import Config
+from src.features import build_dataset
+from src.model import _evaluate, _make_model, _train_val_split
+
+
+def _candidates(space: dict, n: int, seed: int) -> List[dict]:
+    keys = list(space.keys())
+    grid = [dict(zip(keys, combo)) for combo in itertools.product(*space.values())]
+    if len(grid) > n:
+        grid = random.Random(seed).sample(grid, n)
+    return grid
+
+
+def _trial_key(dataset_hash: str, model_type: str, params: dict, n_rows: int) -> str:
+    # n_jobs 只影响速度，不参与缓存 key
+    clean = {k: v for k, v in sorted(params.items()) if k != "n_jobs"}
+    return joblib.hash((dataset_hash, model_type, clean, n_rows))
+
+
+def _run_trial(args: Tuple[str, str, dict, int, int, str]) -> Tuple[dict, dict]:
+    data_dir, model_type, params, n_rows, n_jobs, out_path = args
+    data = {k: np.load(Path(data_dir) / f"{k}.npy", mmap_mode="r") for k in ["X_train", "y_train", "X_val", "y_val"]}
+    X_train, y_train = data["X_train"][:n_rows], data["y_train"][:n_rows]
+    fit_params = dict(params)
+    if model_type != "logistic_regression":
+        fit_params["n_jobs"] = n_jobs
+    model = _make_model(model_type, fit_params)
+    try:
+        model.fit(X_train, y_train)
+        metrics = _evaluate(model, data["X_val"], data["y_val"])
+    except Exception as exc:
+        # 早期 rung 的小样本可能只有一个类别；记为最差分数，不写缓存以便下次重试
+        return params, {"error": f"{type(exc).__name__}: {exc}"}
+    tmp_path = f"{out_path}.tmp"
+    joblib.dump({"params": params, "n_rows": n_rows, "metrics": metrics, "model": model}, tmp_path)
+    os.replace(tmp_path, out_path)
+    return params, metrics
+
+
+METRICS = ("precision", "recall", "f1", "auc")
+
+
+def _score(metrics: dict, metric: str) -> float:
+    if "error" in metrics:
+        return float("-inf")
+    return metrics.get(metric) or 0.0
+
+
+def _pool_sizes(n_trials: int, n_workers: Optional[int]) -> Tuple[int, int]:
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(n_workers or cpus, n_trials, cpus))
+    # 进程数 x 每个模型的线程数不超过 CPU 核数
+    return workers, max(1, cpus // workers)
+
+
+def tune_model(config: Config, logger, config_path: str) -> dict:
+    tune = config.tune
+    if not tune.param_space:
+        raise ValueError("tune.param_space is empty")
+    if tune.metric not in METRICS:
+        raise ValueError(f"Unknown tune.metric {tune.metric}, expected one of {METRICS}")
+    X, y = build_dataset(config, logger)
+    X_train, y_train, X_val, y_val = _train_val_split(X, y, config.train.train_ratio)
+    dataset_hash = joblib.hash((X, y, config.train.train_ratio))
+
+    cache_dir = Path(config.paths.cache_dir) / "tune" / dataset_hash
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # 训练数据落盘为 .npy，worker 以 mmap 方式读取，避免每个 trial 都 pickle 一份
+    for name, arr in {"X_train": X_train, "y_train": y_train, "X_val": X_val, "y_val": y_val}.items():
+        path = cache_dir / f"{name}.npy"
+        if not path.exists():
+            with open(f"{path}.tmp", "wb") as f:
+                np.save(f, arr)
+            os.replace(f"{path}.tmp", path)
+
+    candidates = _candidates(tune.param_space, tune.n_candidates, config.app.random_seed)
+    base = config.train.model_params
+    candidates = [{**base, **c} for c in candidates]
+    n_rungs, remaining = 1, len(candidates)
+    while remaining > 1:
+        remaining = max(1, remaining // tune.eta)
+        n_rungs += 1
+    logger.info("Tuning %s candidates over %s rungs (dataset %s)", len(candidates), n_rungs, dataset_hash[:12])
+
+    ranked: List[Tuple[dict, dict]] = []
+    for rung in range(n_rungs):
+        fraction = min(1.0, tune.min_fraction * tune.eta ** rung) if rung < n_rungs - 1 else 1.0
+        n_rows = max(1, int(len(X_train) * fraction))
+        results: List[Optional[dict]] = [None] * len(candidates)
+        pending = []
+        for i, params in enumerate(candidates):
+            out_path = cache_dir / f"{_trial_key(dataset_hash, config.train.model_type, params, n_rows)}.joblib"
+            if out_path.exists():
+                results[i] = joblib.load(out_path)["metrics"]
+            else:
+                pending.append((i, params, out_path))
+        workers, n_jobs = _pool_sizes(len(pending), tune.n_workers)
+        logger.info(
+            "Rung %s: %s candidates on %s rows (%s cached), %s workers x %s threads",
+            rung,
+            len(candidates),
+            n_rows,
+            len(candidates) - len(pending),
+            workers,
+            n_jobs,
+        )
+        if pending:
+            args = [(str(cache_dir), config.train.model_type, p, n_rows, n_jobs, str(o)) for _, p, o in pending]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for (i, _, _), (_, metrics) in zip(pending, pool.map(_run_trial, args)):
+                    results[i] = metrics
+        for params, metrics in zip(candidates, results):
+            if "error" in metrics:
+                logger.warning("Trial %s on %s rows failed: %s", params, n_rows, metrics["error"])
+        # 同分按候选顺序排，缓存命中与否不影响晋级结果
+        order = sorted(range(len(candidates)), key=lambda i: (-_score(results[i], tune.metric), i))
+        ranked = [(candidates[i], results[i]) for i in order]
+        keep = max(1, len(ranked) // tune.eta)
+        candidates = [p for p, _ in ranked[:keep]]
+        if len(ranked) == 1:
+            break
+
+    best_params, best_metrics = ranked[0]
+    if "error" in best_metrics:
+        raise RuntimeError(f"All tuning trials failed, last error: {best_metrics['error']}")
+    logger.info("Best params %s with metrics %s", best_params, best_metrics)
+
+    best_path = cache_dir / f"{_trial_key(dataset_hash, config.train.model_type, best_params, len(X_train))}.joblib"
+    if best_path.exists():
+        joblib.dump(joblib.load(best_path)["model"], config.train.model_output)
+        logger.info("Best model saved to %s", config.train.model_output)
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    data.setdefault("train", {})["model_params"] = best_params
+    Path(tune.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(tune.output, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
+    logger.info("Tuned config saved to %s", tune.output)
+    return best_params
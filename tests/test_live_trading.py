@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from src.config import DatasetConfig
+from src.data_collector import format_book_row
+from src.features import build_registry, compute_features, total_lookback
+from src.live_trading import LiveFeatureBuilder
+
+
+def _books(n):
+    rng = np.random.default_rng(0)
+    mid = 100 * np.cumprod(1 + rng.normal(0, 0.001, n))
+    for i, m in enumerate(mid):
+        qty = rng.uniform(0.1, 2.0, size=(2, 12))
+        yield {
+            "event_time": i,
+            "bids": {m - 0.01 * (k + 1): float(qty[0, k]) for k in range(12)},
+            "asks": {m + 0.01 * (k + 1): float(qty[1, k]) for k in range(12)},
+        }
+
+
+def test_live_features_match_offline_build():
+    cfg = DatasetConfig()
+    registry = build_registry(cfg)
+    features = list(registry.keys())
+    lookback = max(total_lookback(registry, n) for n in features)
+    books = list(_books(lookback + 20))
+
+    offline = pd.DataFrame([format_book_row(ob, 0.0, cfg.top_levels, cfg.agg_depths) for ob in books])
+    compute_features(offline, registry, features)
+
+    builder = LiveFeatureBuilder(cfg, features, lookback)
+    for i, ob in enumerate(books):
+        mid, feat = builder.update(ob)
+        assert mid == offline["mid"].iloc[i]
+        if i < lookback:
+            assert feat is None
+        else:
+            np.testing.assert_allclose(feat[0], offline[features].iloc[i].to_numpy(dtype=float), rtol=1e-9, atol=1e-12)
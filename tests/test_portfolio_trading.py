@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import joblib
+import numpy as np
+import pytest
+from src.config import Config
+from src.exchange.mock_exchange import MockLighterClient
+from src.portfolio_trading import run_portfolio_trading
+
+
+FEATURES = ["spread", "imbalance_5", "ret_1", "ret_1_lag_1"]
+
+
+class StubModel:
+    def __init__(self, n_features: int = len(FEATURES), fail: bool = False) -> None:
+        self.n_features_in_ = n_features
+        self.fail = fail
+        self.calls = 0
+
+    def predict_proba(self, X):
+        assert X.shape[1] == self.n_features_in_ and np.isfinite(X).all()
+        if self.fail:
+            raise RuntimeError("boom")
+        self.calls += 1
+        p = 0.9 if self.calls % 2 else 0.1
+        return np.column_stack([np.full(len(X), 1 - p), np.full(len(X), p)])
+
+
+def _config(tmp_path, model) -> Config:
+    path = tmp_path / "model.joblib"
+    joblib.dump(model, path)
+    dataset_path = tmp_path / "dataset.pkl"
+    joblib.dump({"features": FEATURES, "lookback": 2}, dataset_path)
+    return Config(
+        live={
+            "model_path": str(path),
+            "dataset_path": str(dataset_path),
+            "symbols": ["BTCUSDT", "ETHUSDT"],
+            "mock": True,
+            "mock_ticks": 5,
+            "take_profit": 0.0,
+        }
+    )
+
+
+def test_portfolio_runs_against_mock_exchanges(tmp_path):
+    cfg = _config(tmp_path, StubModel())
+    lighter = MockLighterClient(logging.getLogger("test"))
+    states = asyncio.run(asyncio.wait_for(run_portfolio_trading(cfg, logging.getLogger("test"), lighter=lighter), 10))
+    assert set(states) == {"BTCUSDT", "ETHUSDT"}
+    assert all(s.last_mid > 0 for s in states.values())
+    assert {o["symbol"] for o in lighter.orders} == {"BTCUSDT", "ETHUSDT"}
+
+
+def test_portfolio_rejects_model_with_wrong_inputs(tmp_path):
+    cfg = _config(tmp_path, StubModel(n_features=44))
+    with pytest.raises(ValueError):
+        asyncio.run(run_portfolio_trading(cfg, logging.getLogger("test")))
+
+
+def test_portfolio_stops_when_a_symbol_task_fails(tmp_path):
+    cfg = _config(tmp_path, StubModel(fail=True))
+    with pytest.raises(RuntimeError):
+        asyncio.run(asyncio.wait_for(run_portfolio_trading(cfg, logging.getLogger("test")), 10))